@@ -1,80 +1,339 @@
 import asyncio
 import aiohttp
-from bs4 import BeautifulSoup
+import cachetools
+import hashlib
+import lxml.etree
+import lxml.html
 from datetime import datetime
 from typing import Optional
 import logging
 from urllib.parse import urlparse
+import functools
+import itertools
 import random
-from time import sleep
-import json
+import time
+import orjson
 import re
+import tiktoken
 from config import Config
-from openai import AzureOpenAI
+from openai import AsyncAzureOpenAI
 import os
 from dotenv import load_dotenv
 
 # Force reload environment variables
 load_dotenv(override=True)
 
+# Compiled once at import; a single case-insensitive scan of the body
+# replaces lowering the whole response and searching it per keyword
+BLOCKING_RE = re.compile(r"captcha|access denied|rate limit|are you a robot", re.IGNORECASE)
+
+# Class-name matchers compiled once at import rather than rebuilt (and
+# re-parsed by libxml2) on every extraction; translate() is XPath 1.0's
+# lower-casing idiom so matching stays case-insensitive
+_LOWER_CLASS = "translate(@class, 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz')"
+PRICE_XPATH = lxml.etree.XPath(
+    "//*[%s]" % " or ".join(f"contains({_LOWER_CLASS}, '{term}')" for term in ('price', 'prijs', 'amount', 'bedrag'))
+)
+PRODUCT_XPATH = lxml.etree.XPath(
+    "//*[%s]" % " or ".join(f"contains({_LOWER_CLASS}, '{term}')" for term in ('product', 'artikel', 'item'))
+)
+
+# Price formats we can extract without the LLM: '€ 9,99', '$9.99',
+# '9,99 EUR' and similar. When every price element agrees on a single
+# value the extraction is resolved locally and the LLM call is skipped
+PRICE_FASTPATH_RE = re.compile(
+    r"(?P<cur_pre>€|\$|EUR)\s*(?P<amount_pre>\d{1,5}[.,]\d{2})(?!\d)"
+    r"|(?<![\d.,])(?P<amount_post>\d{1,5}[.,]\d{2})\s*(?P<cur_post>€|\$|EUR)"
+)
+
+# Promotion wording (Dutch retail) that the fast path cannot express; any
+# hit means the LLM must describe the deal instead
+PROMO_RE = re.compile(r"korting|aanbieding|actie|gratis|halve prijs|van\s*/\s*voor", re.IGNORECASE)
+
+# Token budget for the variable part of the extraction prompt; counting
+# real tokens instead of slicing characters keeps input cost predictable
+# and stops redundant markup from crowding out the useful snippets
+_PROMPT_TOKEN_BUDGET = 800
+_TOKEN_ENCODER = tiktoken.encoding_for_model("gpt-4o")
+
+# User agents to rotate through for avoiding detection, and the static
+# browser-mimicking headers shared by every request
+_USER_AGENTS = [
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:89.0) Gecko/20100101 Firefox/89.0',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.1.1 Safari/605.1.15',
+]
+_BASE_HEADERS = {
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Accept-Encoding': 'zstd, br, gzip, deflate',
+    'DNT': '1',
+    'Connection': 'keep-alive',
+}
+
+# Domains where the LLM recently confirmed no blocking, so repeat scrapes
+# can skip the (slow, paid) LLM check for a while
+_DOMAIN_OK_CACHE: dict[str, float] = {}
+_DOMAIN_OK_TTL = 600  # seconds
+
+# Extraction caches: a short-TTL URL tier that skips the request entirely,
+# a content-hash tier that skips the LLM when the cleaned HTML is unchanged,
+# and the last ETag per URL so the origin can answer 304 Not Modified
+_URL_CACHE: cachetools.TTLCache = cachetools.TTLCache(maxsize=10_000, ttl=600)
+_CONTENT_CACHE: cachetools.TTLCache = cachetools.TTLCache(maxsize=10_000, ttl=3600)
+_ETAG_CACHE: cachetools.TTLCache = cachetools.TTLCache(maxsize=10_000, ttl=3600)
+
+# Static system prompts, sent unchanged on every call so Azure OpenAI can
+# cache the prefix (requires >=1024 tokens, hence the worked examples).
+# Only the HTML in the user message varies between requests.
+SYSTEM_BLOCK = """You are a web-scraping assistant that inspects raw HTML responses and decides whether the page shows signs of blocking or anti-bot measures.
+
+Consider things like:
+- Presence of CAPTCHAs (reCAPTCHA, hCaptcha, FunCaptcha, Cloudflare Turnstile widgets or their script tags)
+- Access denied / forbidden messages ("Access Denied", "You don't have permission to access", "403 Forbidden")
+- Robot detection messages ("Are you a robot?", "Verify you are human", "Checking your browser before accessing")
+- Rate limiting notices ("Too many requests", "Rate limit exceeded", "Please try again later")
+- Interstitial or challenge pages (Cloudflare "Just a moment...", Akamai, PerimeterX/HUMAN, DataDome challenge pages)
+- Unusual redirects to verification or login walls when a product page was requested
+- Suspiciously empty bodies where a full storefront page was expected
+
+Do NOT flag:
+- Normal cookie-consent banners or GDPR dialogs
+- Newsletter signup modals or app-install prompts
+- Age verification prompts that still render the product content behind them
+- Maintenance pages (those are outages, not blocking)
+- Login prompts on pages that also render public product data
+
+Respond with JSON only, with keys 'is_blocked' (boolean) and 'reason' (string, short explanation; empty string when not blocked).
+
+Examples:
+
+Input HTML:
+<!DOCTYPE html><html><head><title>Just a moment...</title><script src="/cdn-cgi/challenge-platform/h/b/orchestrate/chl_page/v1"></script></head><body><div id="challenge-running">Checking your browser before accessing shop.example.com. This process is automatic.</div></body></html>
+Output:
+{"is_blocked": true, "reason": "Cloudflare browser-check interstitial instead of page content"}
+
+Input HTML:
+<html><head><title>Access Denied</title></head><body><h1>Access Denied</h1><p>You don't have permission to access "http://www.example.com/producten/" on this server.</p><p>Reference #18.7d4c1002.1699887766.2a0f5c8</p></body></html>
+Output:
+{"is_blocked": true, "reason": "Akamai-style access denied page with reference code"}
+
+Input HTML:
+<html><head><title>Therme Hammam Showergel 200 ml | Example Drogist</title><meta name="description" content="Bestel Therme Hammam Showergel online."></head><body><div class="cookie-banner">Wij gebruiken cookies om je beter van dienst te zijn. <button>Accepteren</button></div><main><h1 class="product-title">Therme Hammam Showergel 200 ml</h1><span class="product-price">€ 5,99</span></main></body></html>
+Output:
+{"is_blocked": false, "reason": ""}
+
+Input HTML:
+<html><head><title>Verificatie vereist</title></head><body><form id="captcha-form"><div class="g-recaptcha" data-sitekey="6LcAbcdEFGhij"></div><p>Bevestig dat je geen robot bent om verder te gaan.</p></form></body></html>
+Output:
+{"is_blocked": true, "reason": "reCAPTCHA challenge replaces the requested page"}
+
+Input HTML:
+<html><head><title>Mooi assortiment | Voordeeldrogisterij</title></head><body><div class="modal newsletter">Schrijf je in voor onze nieuwsbrief en ontvang 10% korting!</div><section class="product-detail"><h1>Shampoo Herstellend 300ml</h1><div class="price-block"><span class="amount">7,49</span></div></section></body></html>
+Output:
+{"is_blocked": false, "reason": ""}
+
+Input HTML:
+<html><head><title>Too Many Requests</title></head><body><h1>429 Too Many Requests</h1><p>You have sent too many requests in a given amount of time. Please wait before retrying.</p><p>Retry-After: 120</p></body></html>
+Output:
+{"is_blocked": true, "reason": "Rate limit exceeded (HTTP 429 page)"}
+
+Input HTML:
+<html><head><title>Onderhoud | Example Shop</title></head><body><div class="maintenance"><h1>We zijn zo terug!</h1><p>Onze winkel is tijdelijk offline voor gepland onderhoud. Probeer het over een paar minuten opnieuw.</p></div></body></html>
+Output:
+{"is_blocked": false, "reason": ""}"""
+
+SYSTEM_EXTRACT = """You are a product-data extraction assistant. You receive pre-cleaned HTML fragments from a retail product page (price-related elements plus the surrounding product section) and extract structured product information.
+
+Find the following information:
+- Product name
+- Current price (as a decimal number, e.g., 9.99)
+- Currency symbol or code (e.g., €, EUR)
+- Any promotional text or deals
+
+Important:
+- Look for price elements with classes containing 'price', 'prijs', 'amount'
+- Price might be formatted as "9.99", "€9.99", "9,99 EUR", or similar
+- Convert comma-separated prices to decimal (e.g., "9,99" → 9.99)
+- When both an old (struck-through) price and a current/sale price are shown, report the current price and describe the discount in 'promotion'
+- Prices split over multiple elements (e.g., <span class="euros">5</span><span class="cents">99</span>) should be recombined (5.99)
+- Ignore prices of recommended/related products, shipping costs, and loyalty-point values; extract the main product's price only
+- If a unit price is shown alongside (e.g., "€ 29,95 / liter"), do not confuse it with the product price
+- Dutch retail terms: 'prijs' = price, 'korting' = discount, 'aanbieding'/'actie' = promotion, 'van/voor' = was/now pricing, 'gratis' = free, 'tweede halve prijs' = second item half price, '1+1 gratis' = buy one get one free
+
+Format the response as JSON with keys: 'name', 'price' (number), 'currency', 'promotion' (null if none). Use null for any value that cannot be found. Respond with JSON only.
+
+Examples:
+
+Input:
+Price-related elements:
+<span class="product-price">€ 5,99</span> <span class="product-price-old">€ 7,49</span>
+Product section:
+<div class="product-detail"><h1>Therme Hammam Showergel 200 ml</h1><div class="promo-label">20% korting</div></div>
+Output:
+{"name": "Therme Hammam Showergel 200 ml", "price": 5.99, "currency": "€", "promotion": "20% korting (was € 7,49)"}
+
+Input:
+Price-related elements:
+<div class="price-block"><span class="amount">12</span><sup class="amount-cents">49</sup></div>
+Product section:
+<section class="product"><h1 class="product-title">Nivea Creme 150ml Voordeelpak</h1><span class="unit-price">€ 83,27 / liter</span></section>
+Output:
+{"name": "Nivea Creme 150ml Voordeelpak", "price": 12.49, "currency": "€", "promotion": null}
+
+Input:
+Price-related elements:
+<span class="sales-price">9.99 EUR</span>
+Product section:
+<article class="product-item"><h1>Vitamine C 1000mg - 90 tabletten</h1><div class="actie-banner">1+1 gratis</div><div class="related"><span class="price">4,99</span> Vitamine D3</div></article>
+Output:
+{"name": "Vitamine C 1000mg - 90 tabletten", "price": 9.99, "currency": "EUR", "promotion": "1+1 gratis"}
+
+Input:
+Price-related elements:
+<span class="prijs">€4,25</span>
+Product section:
+None
+Output:
+{"name": null, "price": 4.25, "currency": "€", "promotion": null}
+
+Input:
+Price-related elements:
+<div class="price-wrapper"><del class="price-was">€ 21,99</del><ins class="price-now">€ 15,39</ins></div> <span class="bezorgkosten-bedrag">€ 3,95</span>
+Product section:
+<div class="artikel-detail"><h1 class="artikel-naam">Elektrische Tandenborstel Starterset</h1><p class="actie">Tijdelijk 30% korting, actie loopt t/m zondag</p><p class="bezorging">Bezorgkosten € 3,95 (gratis vanaf € 20,-)</p></div>
+Output:
+{"name": "Elektrische Tandenborstel Starterset", "price": 15.39, "currency": "€", "promotion": "Tijdelijk 30% korting, actie loopt t/m zondag (was € 21,99)"}"""
+
+# Bounds concurrent LLM calls so parallel scrapes stay within the Azure
+# OpenAI deployment's tokens-per-minute budget
+_LLM_SEMAPHORE = asyncio.Semaphore(8)
+
+@functools.lru_cache(maxsize=1)
+def _llm_client() -> AsyncAzureOpenAI:
+    """
+    Build the Azure OpenAI client once and share it across all scrapers
+
+    Client construction parses env/config and sets up an httpx client;
+    caching it means batch scrapes pay that cost a single time and share
+    one connection pool.
+    """
+    logging.debug(f"Azure OpenAI endpoint: {Config.AZURE_OPENAI_ENDPOINT}")
+    logging.debug(f"Azure OpenAI deployment: {Config.AZURE_OPENAI_DEPLOYMENT_NAME}")
+    logging.debug(f"Azure OpenAI API version: {Config.AZURE_OPENAI_API_VERSION}")
+    return AsyncAzureOpenAI(
+        api_key=Config.AZURE_OPENAI_KEY or os.environ.get('AZURE_OPENAI_API_KEY'),
+        api_version=Config.AZURE_OPENAI_API_VERSION,
+        azure_endpoint=Config.AZURE_OPENAI_ENDPOINT.split('/openai/')[0]  # Get base URL only
+    )
+
+def _new_session() -> aiohttp.ClientSession:
+    """Build a pooled HTTP session suitable for many concurrent scrapes"""
+    return aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit=100, limit_per_host=10, ttl_dns_cache=300),
+        timeout=aiohttp.ClientTimeout(total=30),
+    )
+
 class SmartScraper:
-    def __init__(self, url: str):
+    def __init__(self, url: str, session: Optional[aiohttp.ClientSession] = None):
         """
         Initialize the scraper with a URL and necessary configurations
         Args:
             url (str): The URL of the product page to scrape
+            session (Optional[aiohttp.ClientSession]): Shared HTTP session to
+                reuse; when omitted the scraper creates (and owns) its own
+                in __aenter__
         """
         self.url = url
         self.domain = urlparse(url).netloc
-        
-        # Debug print the configuration
-        print("\nAzure OpenAI Configuration:")
-        print(f"Endpoint: {Config.AZURE_OPENAI_ENDPOINT}")
-        print(f"Deployment: {Config.AZURE_OPENAI_DEPLOYMENT_NAME}")
-        print(f"API Version: {Config.AZURE_OPENAI_API_VERSION}")
-        
-        # Initialize Azure OpenAI client with correct endpoint formatting
-        self.llm_client = AzureOpenAI(
-            api_key=Config.AZURE_OPENAI_KEY or os.environ.get('AZURE_OPENAI_API_KEY'),
-            api_version=Config.AZURE_OPENAI_API_VERSION,
-            azure_endpoint=Config.AZURE_OPENAI_ENDPOINT.split('/openai/')[0]  # Get base URL only
-        )
-        
+
+        # Azure OpenAI client shared across instances, built on first use
+        self.llm_client = _llm_client()
         self.deployment_name = Config.AZURE_OPENAI_DEPLOYMENT_NAME
         
-        # List of user agents to rotate through for avoiding detection
-        self.user_agents = [
-            'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:89.0) Gecko/20100101 Firefox/89.0',
-            'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.1.1 Safari/605.1.15',
-        ]
+        # Fully materialized header dicts, one per user agent, cycled per
+        # request so rotation costs a single next() instead of rebuilding
+        # the dict and hitting the RNG every time
+        self._header_cycle = itertools.cycle([
+            {**_BASE_HEADERS, 'User-Agent': agent} for agent in _USER_AGENTS
+        ])
+
+        # Shared HTTP session so connections are pooled and TLS handshakes
+        # are amortized across requests; only closed here if we created it
+        self._session = session
+        self._owns_session = session is None
+
+        # ETag of the most recent successful response, used to populate the
+        # per-URL revalidation cache after extraction succeeds
+        self._last_etag: Optional[str] = None
+
+    async def __aenter__(self) -> 'SmartScraper':
+        if self._session is None:
+            self._session = _new_session()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        if self._owns_session and self._session is not None:
+            await self._session.close()
+            self._session = None
 
     async def _safe_request(self) -> tuple[Optional[str], int]:
-        """Make a safe request with error handling and return HTML content and status code"""
-        try:
-            async with aiohttp.ClientSession() as session:
-                headers = self._get_headers()
-                async with session.get(self.url, headers=headers) as response:
-                    content = await response.text()
-                    return content, response.status
-        except Exception as e:
-            logging.error(f"Request failed: {str(e)}")
-            return None, 500
+        """
+        Make a safe request with error handling and return HTML content
+        and status code
+
+        Transient failures (5xx responses, connection errors, timeouts)
+        are retried up to 3 attempts with exponential backoff plus jitter,
+        and each attempt has its own tight timeout so a slow origin can't
+        stall the scrape for aiohttp's 5-minute default.
+        """
+        # Create the owned session lazily so SmartScraper(url).scrape()
+        # keeps working outside an async with block
+        if self._session is None:
+            self._session = _new_session()
+
+        headers = self._get_headers()
+        etag_entry = _ETAG_CACHE.get(self.url)
+        if etag_entry is not None:
+            # the precomputed headers dict is shared, so merge a copy
+            headers = {**headers, 'If-None-Match': etag_entry[0]}
+
+        last_status = 500
+        for attempt in range(3):
+            try:
+                async with self._session.get(
+                    self.url,
+                    headers=headers,
+                    timeout=aiohttp.ClientTimeout(total=15, connect=5),
+                ) as response:
+                    self._last_etag = response.headers.get('ETag')
+                    if response.status < 500:
+                        # decode from the declared charset directly, skipping
+                        # response.text()'s slower encoding-detection fallback
+                        body = await response.read()
+                        content = body.decode(response.charset or 'utf-8', errors='replace')
+                        return content, response.status
+                    last_status = response.status
+                    logging.warning(f"Request attempt {attempt + 1} got HTTP {response.status}")
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logging.warning(f"Request attempt {attempt + 1} failed: {str(e)}")
+            if attempt < 2:
+                await asyncio.sleep(min(2 ** attempt + random.random(), 8))
+
+        logging.error(f"Request failed after 3 attempts: {self.url}")
+        return None, last_status
 
     def _get_headers(self) -> dict:
         """
-        Generate random headers for each request to mimic browser behavior
+        Return the next precomputed headers dict, rotating the user agent
+        to mimic browser behavior
+
+        The returned dict is shared — copy before mutating.
+
         Returns:
-            dict: Headers dictionary with randomized user agent
+            dict: Headers dictionary with the next user agent in the cycle
         """
-        return {
-            'User-Agent': random.choice(self.user_agents),
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'DNT': '1',
-            'Connection': 'keep-alive',
-        }
+        return next(self._header_cycle)
 
     async def _check_for_blocking(self, response_text: str, status_code: int) -> bool:
         """
@@ -87,46 +346,98 @@ class SmartScraper:
         Returns:
             bool: True if blocking is detected, False otherwise
         """
-        # Check common blocking indicators
-        blocking_indicators = [
-            status_code in [403, 429, 503],
-            "captcha" in response_text.lower(),
-            "access denied" in response_text.lower(),
-            "rate limit" in response_text.lower(),
-        ]
+        # Check common blocking indicators: status code first so we can
+        # skip scanning the body entirely, then one pass over the HTML
+        if status_code in (403, 429, 503):
+            logging.error(f"⛔ BLOCKING DETECTED! Status code: {status_code}")
+            return True
 
-        if any(blocking_indicators):
+        if BLOCKING_RE.search(response_text):
             logging.error(f"⛔ BLOCKING DETECTED! Status code: {status_code}")
             return True
 
+        # Skip the LLM round-trip when we already have enough signal:
+        # block pages are small, so a large body means real content, and a
+        # recent all-clear for this domain is very unlikely to have changed
+        if len(response_text) > 200_000 or self._domain_recently_ok():
+            return False
+
         # Use LLM to detect more sophisticated blocking methods
         try:
-            prompt = """Analyze this HTML response and determine if it shows signs of blocking or anti-bot measures.
-            Consider things like:
-            - Presence of CAPTCHAs
-            - Access denied messages
-            - Robot detection messages
-            - Unusual redirects
-            
-            Response format: JSON with keys 'is_blocked' (boolean) and 'reason' (string)"""
-
-            response = await asyncio.to_thread(
-                self.llm_client.chat.completions.create,
-                model=self.deployment_name,
-                messages=[{"role": "user", "content": f"{prompt}\n\nFirst 1000 chars of HTML: {response_text[:1000]}"}],
-                response_format={ "type": "json_object" }
+            content = await self._stream_completion(
+                [
+                    {"role": "system", "content": SYSTEM_BLOCK},
+                    {"role": "user", "content": f"First 500 chars of HTML: {response_text[:500]}"},
+                ],
+                64,
             )
-            
-            result = json.loads(response.choices[0].message.content)
+
+            result = orjson.loads(content)
             if result.get('is_blocked'):
                 logging.error(f"🤖 LLM detected blocking: {result.get('reason')}")
                 return True
-                
+
+            _DOMAIN_OK_CACHE[self.domain] = time.monotonic()
+
         except Exception as e:
             logging.error(f"Error in LLM blocking check: {str(e)}")
-        
+
         return False
 
+    def _domain_recently_ok(self) -> bool:
+        """Check whether the LLM cleared this domain within the cache TTL"""
+        last_ok = _DOMAIN_OK_CACHE.get(self.domain)
+        return last_ok is not None and time.monotonic() - last_ok < _DOMAIN_OK_TTL
+
+    async def _stream_completion(self, messages: list, max_tokens: int) -> str:
+        """
+        Run a streaming chat completion and return the accumulated content
+
+        Streaming lets us start consuming output as soon as the model emits
+        it instead of waiting for the full response, and max_tokens bounds
+        the worst-case generation time.
+
+        Args:
+            messages (list): Chat messages for the completion
+            max_tokens (int): Hard cap on generated tokens
+        Returns:
+            str: The full message content
+        """
+        async with _LLM_SEMAPHORE:
+            stream = await self.llm_client.chat.completions.create(
+                model=self.deployment_name,
+                messages=messages,
+                response_format={ "type": "json_object" },
+                max_tokens=max_tokens,
+                stream=True,
+                stream_options={"include_usage": True},
+            )
+
+            parts = []
+            usage = None
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    parts.append(chunk.choices[0].delta.content)
+                if chunk.usage:
+                    usage = chunk.usage
+        self._log_cache_usage(usage)
+        return ''.join(parts)
+
+    @staticmethod
+    def _dump_response(html_content: str) -> None:
+        """Write the raw HTML response to disk for debugging"""
+        with open('last_response.html', 'w', encoding='utf-8') as f:
+            f.write(html_content)
+        logging.debug("💾 Saved HTML response to 'last_response.html'")
+
+    @staticmethod
+    def _log_cache_usage(usage) -> None:
+        """Log how many prompt tokens were served from the Azure prompt cache"""
+        details = getattr(usage, 'prompt_tokens_details', None)
+        cached = getattr(details, 'cached_tokens', None)
+        if cached:
+            logging.info(f"💰 Prompt cache hit: {cached}/{usage.prompt_tokens} tokens cached")
+
     async def _extract_data_with_llm(self, html_content: str) -> Optional[dict]:
         """
         Use Azure OpenAI to extract product information from HTML content
@@ -137,60 +448,150 @@ class SmartScraper:
             Optional[dict]: Extracted product data or None if extraction failed
         """
         try:
-            # Clean HTML by removing scripts and styles to reduce token usage
-            soup = BeautifulSoup(html_content, 'html.parser')
-            
-            # Clean HTML by removing scripts and styles
-            for script in soup(["script", "style"]):
-                script.decompose()
-            
-            # Focus on elements likely to contain prices
-            price_elements = soup.find_all(class_=lambda x: x and any(term in x.lower() for term in ['price', 'prijs', 'amount', 'bedrag']))
-            product_section = str(soup.find(class_=lambda x: x and any(term in x.lower() for term in ['product', 'artikel', 'item'])))
-            
+            # Parse with lxml directly so cleaning and matching run in C
+            # instead of walking the DOM element-by-element in Python
+            tree = lxml.html.fromstring(html_content)
+
+            # Clean HTML by removing everything irrelevant to price extraction
+            # (scripts, styles, embedded svg/iframes, head plumbing) in one C
+            # tree walk, and drop presentational/behavioral attributes that
+            # carry no price signal
+            lxml.etree.strip_elements(tree, 'script', 'style', 'noscript', 'svg', 'iframe', 'link', 'meta', with_tail=False)
+            lxml.etree.strip_attributes(tree, 'style', 'srcset', 'onclick', 'onload')
+            for elem in tree.iter():
+                # strip_attributes has no wildcard support, so data-* goes manually
+                for attr in [a for a in elem.attrib if a.startswith('data-')]:
+                    del elem.attrib[attr]
+
+            # Focus on elements likely to contain prices; matches nested
+            # inside another match are dropped, since serializing the
+            # ancestor already includes them and serializing both would
+            # repeat the same markup against the token budget
+            matches = PRICE_XPATH(tree)
+            matched = set(matches)
+            price_elements = [
+                elem for elem in matches
+                if not any(ancestor in matched for ancestor in elem.iterancestors())
+            ]
+
+            # Try resolving the price with plain pattern matching first; on
+            # most pages this makes the LLM call unnecessary
+            fast_result = self._extract_with_patterns(tree, price_elements)
+            if fast_result is not None:
+                logging.info("⚡ Price matched by pattern, skipping LLM extraction")
+                return fast_result
+
+            product_nodes = PRODUCT_XPATH(tree)
+            product_section = lxml.etree.tostring(product_nodes[0], encoding='unicode') if product_nodes else 'None'
+
+            # Greedily pack price snippets up to the token budget, then spend
+            # whatever is left on the product section; counting real tokens
+            # beats a character slice that can over- or under-shoot the model
+            snippets = []
+            used = 0
+            for elem in price_elements:
+                piece = lxml.etree.tostring(elem, encoding='unicode')
+                n_tokens = len(_TOKEN_ENCODER.encode(piece))
+                if used + n_tokens > _PROMPT_TOKEN_BUDGET:
+                    break
+                snippets.append(piece)
+                used += n_tokens
+
+            remaining = _PROMPT_TOKEN_BUDGET - used
+            section_tokens = _TOKEN_ENCODER.encode(product_section)
+            if len(section_tokens) > remaining:
+                product_section = _TOKEN_ENCODER.decode(section_tokens[:remaining])
+
             clean_html = f"""
             Price-related elements:
-            {' '.join(str(elem) for elem in price_elements)}
-            
+            {' '.join(snippets)}
+
             Product section:
             {product_section}
             """
 
-            prompt = """Extract product information from this HTML. 
-            Find the following information:
-            - Product name
-            - Current price (as a decimal number, e.g., 9.99)
-            - Currency symbol or code (e.g., €, EUR)
-            - Any promotional text or deals
-            
-            Important: 
-            - Look for price elements with classes containing 'price', 'prijs', 'amount'
-            - Price might be formatted as "9.99", "€9.99", "9,99 EUR", or similar
-            - Convert comma-separated prices to decimal (e.g., "9,99" → 9.99)
-            
-            Format the response as JSON with keys: 'name', 'price' (number), 'currency', 'promotion' (null if none)"""
+            # Identical cleaned HTML yields identical extractions, so skip
+            # the LLM when we have seen this exact content before
+            content_key = hashlib.blake2b(clean_html.encode()).hexdigest()
+            cached = _CONTENT_CACHE.get(content_key)
+            if cached is not None:
+                # refresh the metadata: identical content can be served under
+                # a different URL than the one that populated the cache
+                logging.info("♻️ Content unchanged, reusing cached extraction")
+                return {**cached, 'url': self.url, 'timestamp': datetime.now().isoformat()}
 
-            response = await asyncio.to_thread(
-                self.llm_client.chat.completions.create,
-                model=self.deployment_name,
-                messages=[{"role": "user", "content": f"{prompt}\n\nHTML content: {clean_html[:4000]}"}],
-                response_format={ "type": "json_object" }
+            content = await self._stream_completion(
+                [
+                    {"role": "system", "content": SYSTEM_EXTRACT},
+                    {"role": "user", "content": clean_html},
+                ],
+                256,
             )
-            
-            extracted_data = json.loads(response.choices[0].message.content)
+
+            extracted_data = orjson.loads(content)
             
             # Add metadata to the extracted data
             extracted_data.update({
                 'timestamp': datetime.now().isoformat(),
                 'url': self.url
             })
-            
+
+            _CONTENT_CACHE[content_key] = extracted_data
             return extracted_data
 
         except Exception as e:
             logging.error(f"LLM extraction error: {str(e)}")
             return None
 
+    def _extract_with_patterns(self, tree, price_elements) -> Optional[dict]:
+        """
+        Try to extract the product data with compiled price patterns alone
+
+        Only succeeds when every price element agrees on one price and no
+        promotion wording is present, so ambiguous pages (sale prices,
+        related products, promo banners) still go to the LLM.
+
+        Args:
+            tree: Parsed lxml document
+            price_elements: Elements matched by PRICE_XPATH
+        Returns:
+            Optional[dict]: Extracted product data, or None to fall back
+        """
+        found = set()
+        for elem in price_elements:
+            for match in PRICE_FASTPATH_RE.finditer(elem.text_content()):
+                amount = match.group('amount_pre') or match.group('amount_post')
+                currency = match.group('cur_pre') or match.group('cur_post')
+                found.add((amount, currency))
+
+        if len(found) != 1:
+            return None
+
+        # A single displayed price can still carry a deal ("1+1 gratis",
+        # "20% korting"); the fast path would silently report promotion=None,
+        # so any promo wording sends the page to the LLM instead
+        promo_texts = [elem.text_content() for elem in price_elements]
+        product_nodes = PRODUCT_XPATH(tree)
+        if product_nodes:
+            promo_texts.append(product_nodes[0].text_content())
+        if any(PROMO_RE.search(text) for text in promo_texts):
+            return None
+
+        name_node = tree.find('.//h1')
+        name = name_node.text_content().strip() if name_node is not None else None
+        if not name:
+            return None
+
+        amount, currency = found.pop()
+        return {
+            'name': name,
+            'price': float(amount.replace(',', '.')),
+            'currency': currency,
+            'promotion': None,
+            'timestamp': datetime.now().isoformat(),
+            'url': self.url,
+        }
+
     async def scrape(self) -> Optional[dict]:
         """
         Main scraping method that coordinates the entire scraping process
@@ -198,8 +599,22 @@ class SmartScraper:
         Returns:
             Optional[dict]: Scraped product data or None if scraping failed
         """
+        cached = _URL_CACHE.get(self.url)
+        if cached is not None:
+            return {**cached, 'timestamp': datetime.now().isoformat()}
+
         html_content, status_code = await self._safe_request()
-        
+
+        # Origin confirmed the page is unchanged; reuse the extraction that
+        # produced the ETag we sent
+        if status_code == 304:
+            etag_entry = _ETAG_CACHE.get(self.url)
+            if etag_entry is not None:
+                logging.info("♻️ Page unchanged (HTTP 304), reusing cached extraction")
+                result = {**etag_entry[1], 'timestamp': datetime.now().isoformat()}
+                _URL_CACHE[self.url] = result
+                return result
+
         if html_content is None:
             return None
 
@@ -208,12 +623,34 @@ class SmartScraper:
             logging.error("Scraping blocked by website")
             return None
 
-        # Save HTML response for debugging
-        with open('last_response.html', 'w', encoding='utf-8') as f:
-            f.write(html_content)
-        logging.info("💾 Saved HTML response to 'last_response.html'")
+        # Save HTML response for debugging; only when debug logging is on,
+        # and off the event loop so a multi-MB write doesn't stall other scrapes
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            await asyncio.to_thread(self._dump_response, html_content)
 
-        return await self._extract_data_with_llm(html_content)
+        result = await self._extract_data_with_llm(html_content)
+        if result is not None:
+            _URL_CACHE[self.url] = result
+            if self._last_etag:
+                _ETAG_CACHE[self.url] = (self._last_etag, result)
+        return result
+
+async def scrape_many(urls: list[str]) -> list[Optional[dict]]:
+    """
+    Scrape multiple product URLs concurrently over one shared HTTP session
+
+    Args:
+        urls (list[str]): Product page URLs to scrape
+    Returns:
+        list[Optional[dict]]: Scraped data per URL, in input order
+    """
+    session = _new_session()
+    try:
+        async with asyncio.TaskGroup() as tg:
+            tasks = [tg.create_task(SmartScraper(url, session=session).scrape()) for url in urls]
+        return [task.result() for task in tasks]
+    finally:
+        await session.close()
 
 async def main():
     # Configure logging
@@ -221,17 +658,26 @@ async def main():
         level=logging.INFO,
         format='%(asctime)s - %(levelname)s - %(message)s'
     )
-    
-    url = "https://www.etos.nl/producten/therme-hammam-showergel-200-ml-110902232.html"
-    scraper = SmartScraper(url)
-    result = await scraper.scrape()
-    
-    if result:
-        print("\n📦 Scraped Data:")
-        for key, value in result.items():
-            print(f"{key}: {value}")
-    else:
-        print("❌ Failed to scrape data")
+
+    urls = [
+        "https://www.etos.nl/producten/therme-hammam-showergel-200-ml-110902232.html",
+    ]
+    results = await scrape_many(urls)
+
+    for url, result in zip(urls, results):
+        if result:
+            print("\n📦 Scraped Data:")
+            for key, value in result.items():
+                print(f"{key}: {value}")
+        else:
+            print(f"❌ Failed to scrape data for {url}")
 
 if __name__ == "__main__":
+    # uvloop's event loop is substantially faster for aiohttp-heavy
+    # workloads; fall back to the default loop where it's unavailable
+    try:
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    except ImportError:
+        pass
     asyncio.run(main())